@@ -17,7 +17,10 @@ CREATE TABLE admin_woredas (
     woreda_name VARCHAR(100) NOT NULL UNIQUE,
     zone_name VARCHAR(100),
     region_name VARCHAR(100),
-    geom GEOMETRY(MultiPolygon, 4326)
+    geom GEOMETRY(MultiPolygon, 4326),
+    -- Static centroids, computed once when a boundary is loaded
+    centroid_lat DOUBLE PRECISION GENERATED ALWAYS AS (ST_Y(ST_Centroid(geom))) STORED,
+    centroid_lon DOUBLE PRECISION GENERATED ALWAYS AS (ST_X(ST_Centroid(geom))) STORED
 );
 CREATE INDEX woredas_geom_idx ON admin_woredas USING GIST (geom);
 
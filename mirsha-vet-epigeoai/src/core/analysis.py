@@ -4,11 +4,18 @@ from pysal.lib import weights
 from esda.moran import Moran_Local
 
 @st.cache_data
-def calculate_lisa(gdf, attribute_column):
+def calculate_lisa(gdf, attribute_column, _w=None):
     """
     Calculates Local Moran's I (LISA) for a given GeoDataFrame and attribute.
+    A prebuilt spatial weights object for the same rows, in the same order, can
+    be passed as `_w` (not hashed by the cache, as it is derived from the
+    geometries); it is row-standardized in place. Otherwise Queen contiguity
+    weights are built from the geometries.
     Returns the GeoDataFrame with LISA results appended.
     """
+    if _w is not None and _w.n != len(gdf):
+        raise ValueError(f"Spatial weights cover {_w.n} observations but the GeoDataFrame has {len(gdf)} rows.")
+
     if gdf.empty or attribute_column not in gdf.columns or gdf[attribute_column].nunique() < 2:
         gdf['lisa_q'] = 0
         gdf['lisa_p'] = 1.0
@@ -16,8 +23,8 @@ def calculate_lisa(gdf, attribute_column):
         return gdf
 
     try:
-        # Create spatial weights matrix from polygon contiguity
-        w = weights.Queen.from_dataframe(gdf)
+        # Create spatial weights matrix from polygon contiguity (unless one was supplied)
+        w = _w if _w is not None else weights.Queen.from_dataframe(gdf)
         w.transform = 'r'  # Row-standardize
 
         # Calculate Local Moran's I
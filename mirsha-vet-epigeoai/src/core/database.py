@@ -1,6 +1,14 @@
 import os
+import io
+import base64
+from functools import lru_cache
 import psycopg2
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 from dotenv import load_dotenv
 import json 
@@ -9,31 +17,105 @@ import geopandas as gpd
 # Load environment variables from a .env file
 load_dotenv()
 
-# Use Streamlit's connection management for efficiency
+# Woreda outlines are drawn at national zoom (zoom_start=6, ~2.4 km per pixel),
+# so display geometries are simplified and snapped well below pixel size.
+DISPLAY_SIMPLIFY_TOLERANCE = 0.005 # degrees (~550 m)
+DISPLAY_COORD_PRECISION = 1e-4 # degrees (~11 m grid)
+
+# Pool sizing: a couple of warm connections per app process, capped well below
+# PostgreSQL's default max_connections (100) so several processes can share the server
+POOL_MIN_CONNECTIONS = 2
+POOL_MAX_CONNECTIONS = 10
+
+# Columns of get_woreda_summary(), also used for its empty result on failure
+WOREDA_SUMMARY_COLUMNS = [
+    'woreda_code', 'woreda_name', 'geom', 'total_cases', 'total_deaths',
+    'total_susceptible', 'attack_rate_percent', 'cfr_percent'
+]
+
+# Use Streamlit's resource caching to keep one connection pool per process
 @st.cache_resource
+def get_pool():
+    """
+    Creates a thread-safe connection pool using credentials from environment
+    variables. Uses Streamlit's caching so the pool is shared across reruns
+    and sessions. Raises psycopg2.OperationalError if the database is down
+    (exceptions are not cached, so the next call retries).
+    """
+    pool = ThreadedConnectionPool(
+        minconn=POOL_MIN_CONNECTIONS,
+        maxconn=POOL_MAX_CONNECTIONS,
+        host="db", # In Docker Compose, 'db' is the hostname for the database service
+        port=os.getenv("DB_PORT", "5432"),
+        dbname=os.getenv("DB_NAME", "vet_epigeoai_db"),
+        user=os.getenv("DB_USER", "vet_user"),
+        password=os.getenv("DB_PASSWORD", "strongpassword")
+    )
+    print("Database connection pool established.")
+    return pool
+
+@lru_cache(maxsize=None)
+def get_sqlalchemy_engine():
+    """
+    Returns a SQLAlchemy engine for GeoPandas writers (to_postgis/to_sql),
+    built once per process so its URL parsing and connection pool are reused.
+    """
+    db_url = URL.create(
+        "postgresql+psycopg2",
+        username=os.getenv("DB_USER", "vet_user"),
+        password=os.getenv("DB_PASSWORD", "strongpassword"),
+        host="db",
+        port=int(os.getenv("DB_PORT", "5432")),
+        database=os.getenv("DB_NAME", "vet_epigeoai_db")
+    )
+    return create_engine(
+        db_url,
+        pool_size=5,
+        max_overflow=5,
+        pool_pre_ping=True,
+        executemany_mode='values_plus_batch' # psycopg2 fast path for any executemany INSERTs
+    )
+
 def get_db_connection():
     """
-    Establishes a connection to the PostgreSQL database using credentials
-    from environment variables. Uses Streamlit's caching to maintain a
-    singleton connection.
+    Checks a connection out of the shared pool. Callers must hand it back
+    with put_db_connection() when they are done.
     """
     try:
-        conn = psycopg2.connect(
-            host="db", # In Docker Compose, 'db' is the hostname for the database service
-            port=os.getenv("DB_PORT", "5432"),
-            dbname=os.getenv("DB_NAME", "vet_epigeoai_db"),
-            user=os.getenv("DB_USER", "vet_user"),
-            password=os.getenv("DB_PASSWORD", "strongpassword")
-        )
-        print("Database connection established.")
-        return conn
-    except psycopg2.OperationalError as e:
+        return get_pool().getconn()
+    except psycopg2.Error as e: # OperationalError (server down) or PoolError (pool exhausted)
         st.error(f"❌ Database connection failed. Is the database service running? Details: {e}")
         return None
 
-def add_new_outbreak_report(reporter_name, woreda_name, lat, lon, species, complaint, report_date):
-    """Inserts a new suspected outbreak report into the database."""
-    conn = get_db_connection()
+def put_db_connection(conn):
+    """Returns a connection to the pool (any open transaction is rolled back)."""
+    if conn is not None:
+        get_pool().putconn(conn)
+
+def copy_dataframe(conn, df, table_name, freeze=False):
+    """
+    Bulk-loads a DataFrame into a table with COPY FROM STDIN, streaming it as
+    CSV. Column names must match the table's columns. Does not commit, so the
+    caller controls the transaction. `freeze=True` writes the rows already
+    frozen, which PostgreSQL only allows when the table was created or
+    truncated in the current transaction.
+    """
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    columns = ", ".join(df.columns)
+    options = "FORMAT CSV, FREEZE" if freeze else "FORMAT CSV"
+    with conn.cursor() as cur:
+        cur.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH ({options})", buffer)
+
+def add_new_outbreak_report(reporter_name, woreda_name, lat, lon, species, complaint, report_date, conn=None):
+    """
+    Inserts a new suspected outbreak report into the database.
+    If `conn` is given, the insert runs in the caller's transaction and is not committed.
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     if conn is None:
         return False, "Database connection is not available."
 
@@ -55,15 +137,22 @@ def add_new_outbreak_report(reporter_name, woreda_name, lat, lon, species, compl
             """
             cur.execute(sql, (reporter_name, woreda_code, lat, lon, species, complaint, report_date))
             new_id = cur.fetchone()[0]
-            conn.commit()
+            if owns_conn:
+                conn.commit()
             return True, f"Report successfully submitted with Outbreak ID: {new_id}"
     except Exception as e:
-        conn.rollback()
+        if owns_conn:
+            conn.rollback()
         return False, f"Database error: {e}"
-
-def get_unassigned_reports():
-    """Fetches all outbreak reports with the status 'Unassigned'."""
-    conn = get_db_connection()
+    finally:
+        if owns_conn:
+            put_db_connection(conn)
+
+def get_unassigned_reports(conn=None):
+    """Fetches all outbreak reports with the status 'Unassigned'. Uses `conn` if given."""
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     if conn is None:
         return pd.DataFrame() # Return empty dataframe on connection failure
 
@@ -80,10 +169,18 @@ def get_unassigned_reports():
     except Exception as e:
         st.error(f"Error fetching reports: {e}")
         return pd.DataFrame()
+    finally:
+        if owns_conn:
+            put_db_connection(conn)
 
-def assign_investigator_to_outbreak(outbreak_id, investigator_name):
-    """Updates an outbreak's status to 'Assigned' and sets the investigator."""
-    conn = get_db_connection()
+def assign_investigator_to_outbreak(outbreak_id, investigator_name, conn=None):
+    """
+    Updates an outbreak's status to 'Assigned' and sets the investigator.
+    If `conn` is given, the update runs in the caller's transaction and is not committed.
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = get_db_connection()
     if conn is None:
         return False, "Database connection is not available."
     
@@ -95,11 +192,16 @@ def assign_investigator_to_outbreak(outbreak_id, investigator_name):
     try:
         with conn.cursor() as cur:
             cur.execute(sql, (investigator_name, outbreak_id))
-            conn.commit()
+            if owns_conn:
+                conn.commit()
         return True, f"Outbreak {outbreak_id} assigned to {investigator_name}."
     except Exception as e:
-        conn.rollback()
+        if owns_conn:
+            conn.rollback()
         return False, f"Database error: {e}"
+    finally:
+        if owns_conn:
+            put_db_connection(conn)
  
 
 # ... (keep the existing functions: get_db_connection, add_new_outbreak_report, etc.) ...
@@ -122,6 +224,8 @@ def get_assigned_outbreaks(investigator_name):
     except Exception as e:
         st.error(f"Error fetching assigned outbreaks: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 def get_outbreak_details(outbreak_id):
     """Fetches the initial report details for a specific outbreak ID."""
@@ -148,6 +252,8 @@ def get_outbreak_details(outbreak_id):
     except Exception as e:
         st.error(f"Error fetching outbreak details: {e}")
         return None
+    finally:
+        put_db_connection(conn)
 
 def submit_full_investigation(outbreak_id, investigation_date, form_data, line_list_df, samples_df):
     """
@@ -168,30 +274,39 @@ def submit_full_investigation(outbreak_id, investigation_date, form_data, line_l
             """
             cur.execute(update_sql, (investigation_date, form_data_json, outbreak_id))
 
-            # 2. Insert line list data (if any)
+            # 2. Insert line list data (if any) as a single multi-row INSERT
             if not line_list_df.empty:
-                for index, row in line_list_df.iterrows():
-                    insert_case_sql = """
-                        INSERT INTO outbreak_cases (outbreak_id, species, total_susceptible, cases, deaths, observation_date)
-                        VALUES (%s, %s, %s, %s, %s, %s);
-                    """
-                    cur.execute(insert_case_sql, (outbreak_id, row['Species'], row['Susceptible'], row['Cases'], row['Deaths'], row['Date']))
+                case_rows = [
+                    (outbreak_id, *row)
+                    for row in line_list_df[['Species', 'Susceptible', 'Cases', 'Deaths', 'Date']].itertuples(index=False, name=None)
+                ]
+                insert_case_sql = """
+                    INSERT INTO outbreak_cases (outbreak_id, species, total_susceptible, cases, deaths, observation_date)
+                    VALUES %s;
+                """
+                execute_values(cur, insert_case_sql, case_rows, page_size=1000)
             
-            # 3. Insert sample data (if any)
+            # 3. Insert sample data (if any) as a single multi-row INSERT
             if not samples_df.empty:
-                for index, row in samples_df.iterrows():
-                    insert_sample_sql = """
-                        INSERT INTO samples (outbreak_id, field_sample_id, sample_type, laboratory, submission_date)
-                        VALUES (%s, %s, %s, %s, %s);
-                    """
-                    cur.execute(insert_sample_sql, (outbreak_id, row['Field ID'], row['Sample Type'], row['Laboratory'], row['Submission Date']))
+                sample_rows = [
+                    (outbreak_id, *row)
+                    for row in samples_df[['Field ID', 'Sample Type', 'Laboratory', 'Submission Date']].itertuples(index=False, name=None)
+                ]
+                insert_sample_sql = """
+                    INSERT INTO samples (outbreak_id, field_sample_id, sample_type, laboratory, submission_date)
+                    VALUES %s;
+                """
+                execute_values(cur, insert_sample_sql, sample_rows, page_size=1000)
 
             conn.commit()
+            get_all_samples.clear()
             return True, f"Full investigation for Outbreak ID {outbreak_id} has been successfully submitted."
 
     except Exception as e:
         conn.rollback()
         return False, f"Database transaction failed: {e}"   
+    finally:
+        put_db_connection(conn)
 
 # ... (keep all existing functions) ...
 
@@ -214,6 +329,8 @@ def get_outbreaks_for_tracing():
     except Exception as e:
         st.error(f"Error fetching outbreaks for tracing: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 def get_tracing_links(outbreak_id):
     """Fetches all existing contact tracing links for a given outbreak ID."""
@@ -227,6 +344,8 @@ def get_tracing_links(outbreak_id):
     except Exception as e:
         st.error(f"Error fetching tracing links: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 def add_tracing_link(source_outbreak_id, name, loc_type, lat, lon, date, contact_type, direction, notes):
     """Adds a new contact tracing link to the database."""
@@ -246,6 +365,8 @@ def add_tracing_link(source_outbreak_id, name, loc_type, lat, lon, date, contact
     except Exception as e:
         conn.rollback()
         return False, f"Database error: {e}"
+    finally:
+        put_db_connection(conn)
     
 # ... (keep all existing functions) ...
 
@@ -315,6 +436,18 @@ def get_dashboard_data():
         # Fill NaNs for woredas with no cases
         dashboard_gdf[['total_cases', 'total_deaths', 'attack_rate_percent', 'cfr_percent']] = dashboard_gdf[['total_cases', 'total_deaths', 'attack_rate_percent', 'cfr_percent']].fillna(0)
 
+        # Encode disease names as a sorted categorical so pages can read the filter
+        # options from the categories and filter on integer codes
+        disease_categories = sorted(dashboard_gdf['disease_name'].dropna().unique())
+        dashboard_gdf['disease_name'] = pd.Categorical(
+            dashboard_gdf['disease_name'], categories=disease_categories, ordered=False
+        )
+        outbreaks_df['disease_name'] = pd.Categorical(
+            outbreaks_df['disease_name'],
+            categories=sorted(set(disease_categories) | set(outbreaks_df['disease_name'].dropna())),
+            ordered=False
+        )
+
         # Convert point data to a GeoDataFrame
         outbreaks_gdf = gpd.GeoDataFrame(
             outbreaks_df, 
@@ -330,14 +463,115 @@ def get_dashboard_data():
         return gpd.GeoDataFrame(), gpd.GeoDataFrame()
     
   # ... (keep all existing functions) ...
+    finally:
+        put_db_connection(conn)
+
+@st.cache_data(ttl=600)
+def _load_display_woreda_geometries():
+    """
+    Cached loader for get_display_woreda_geometries. Failures raise instead of
+    returning, so an error is never cached as an empty result.
+    """
+    conn = get_db_connection()
+    if not conn:
+        raise ConnectionError("Database connection not available.")
 
-def save_pe_session_results(outbreak_id, woreda_code, session_date, facilitator, method, data_payload):
-    """Saves the results of a PE session (as a JSON object) to the database."""
+    sql = "SELECT woreda_code, geom FROM admin_woredas;"
+    try:
+        gdf = gpd.read_postgis(sql, conn, geom_col='geom', crs="EPSG:4326")
+        gdf['geom'] = (
+            gdf.geometry
+            .simplify(DISPLAY_SIMPLIFY_TOLERANCE, preserve_topology=True)
+            .set_precision(DISPLAY_COORD_PRECISION)
+        )
+        return gdf
+    finally:
+        put_db_connection(conn)
+
+def get_display_woreda_geometries():
+    """
+    Fetches woreda outlines simplified for map display. Spatial analysis
+    (e.g. LISA contiguity) should keep using the full-resolution geometries.
+    Returns an empty frame with the same columns on failure.
+    """
+    try:
+        return _load_display_woreda_geometries()
+    except Exception as e:
+        st.error(f"Error fetching display geometries: {e}")
+        return gpd.GeoDataFrame(columns=['woreda_code', 'geom'], geometry='geom', crs="EPSG:4326")
+
+@st.cache_data(ttl=600) # Same lifetime as get_dashboard_data so both views stay in sync
+def get_woreda_summary():
+    """
+    Fetches per-woreda case totals and rates across all diseases, aggregated
+    in the database. Returns an empty frame with the same columns on failure.
+    """
+    empty_gdf = gpd.GeoDataFrame(columns=WOREDA_SUMMARY_COLUMNS, geometry='geom', crs="EPSG:4326")
+    conn = get_db_connection()
+    if not conn:
+        return empty_gdf
+
+    sql = """
+        WITH case_totals AS (
+            SELECT
+                o.woreda_code,
+                SUM(oc.cases) AS total_cases,
+                SUM(oc.deaths) AS total_deaths,
+                SUM(oc.total_susceptible) AS total_susceptible
+            FROM outbreak_cases oc
+            JOIN outbreaks o ON oc.outbreak_id = o.outbreak_id
+            WHERE o.status IN ('Completed', 'Confirmed')
+            GROUP BY o.woreda_code
+        )
+        SELECT
+            a.woreda_code,
+            a.woreda_name,
+            a.geom,
+            COALESCE(c.total_cases, 0) AS total_cases,
+            COALESCE(c.total_deaths, 0) AS total_deaths,
+            COALESCE(c.total_susceptible, 0) AS total_susceptible,
+            CASE WHEN c.total_susceptible > 0
+                 THEN 100.0 * c.total_cases / c.total_susceptible ELSE 0 END AS attack_rate_percent,
+            CASE WHEN c.total_cases > 0
+                 THEN 100.0 * c.total_deaths / c.total_cases ELSE 0 END AS cfr_percent
+        FROM admin_woredas a
+        LEFT JOIN case_totals c ON a.woreda_code = c.woreda_code;
+    """
+    try:
+        gdf = gpd.read_postgis(sql, conn, geom_col='geom', crs="EPSG:4326")
+        return gdf
+    except Exception as e:
+        st.error(f"Error fetching woreda summary: {e}")
+        return empty_gdf
+    finally:
+        put_db_connection(conn)
+
+def encode_pe_table(df):
+    """Encodes a PE results DataFrame as a base64 Arrow IPC stream for the JSONB payload."""
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
+
+def decode_pe_table(arrow_b64):
+    """Decodes a base64 Arrow IPC stream written by encode_pe_table back into a DataFrame."""
+    return pa.ipc.open_stream(base64.b64decode(arrow_b64)).read_all().to_pandas()
+
+def save_pe_session_results(outbreak_id, woreda_code, session_date, facilitator, method, data_payload=None, data_payload_json=None):
+    """
+    Saves the results of a PE session (as a JSON object) to the database.
+    Callers that already serialized the payload (e.g. with orjson) can pass
+    the bytes/str via `data_payload_json` to skip the json.dumps step.
+    """
     conn = get_db_connection()
     if not conn: return False, "Database connection not available."
 
     # Convert the Python dictionary to a JSON string for storing in JSONB
-    session_data_json = json.dumps(data_payload)
+    if data_payload_json is not None:
+        session_data_json = data_payload_json.decode("utf-8") if isinstance(data_payload_json, bytes) else data_payload_json
+    else:
+        session_data_json = json.dumps(data_payload)
     
     sql = """
         INSERT INTO pe_sessions 
@@ -354,9 +588,12 @@ def save_pe_session_results(outbreak_id, woreda_code, session_date, facilitator,
     except Exception as e:
         conn.rollback()
         return False, f"Database error while saving PE session: {e}"  
+    finally:
+        put_db_connection(conn)
     
 # ... (keep all existing functions) ...
 
+@st.cache_data(ttl=60, show_spinner=False) # Cleared explicitly whenever samples are written
 def get_all_samples():
     """Fetches all samples from the database for the tracking dashboard."""
     conn = get_db_connection()
@@ -386,6 +623,8 @@ def get_all_samples():
     except Exception as e:
         st.error(f"Error fetching sample data: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 def get_sample_by_field_id(field_sample_id):
     """Fetches a single sample's details by its unique field ID."""
@@ -403,6 +642,8 @@ def get_sample_by_field_id(field_sample_id):
     except Exception as e:
         st.error(f"Error fetching sample by field ID: {e}")
         return None
+    finally:
+        put_db_connection(conn)
 
 def update_sample_status(sample_id, new_status):
     """Updates the status of a sample (e.g., to 'In Transit', 'Received')."""
@@ -414,10 +655,13 @@ def update_sample_status(sample_id, new_status):
         with conn.cursor() as cur:
             cur.execute(sql, (new_status, sample_id))
             conn.commit()
+            get_all_samples.clear()
         return True, f"Status for sample {sample_id} updated to '{new_status}'."
     except Exception as e:
         conn.rollback()
         return False, f"Database error: {e}"
+    finally:
+        put_db_connection(conn)
 
 def submit_lab_result(sample_id, outbreak_id, result, result_details, result_date):
     """
@@ -447,10 +691,13 @@ def submit_lab_result(sample_id, outbreak_id, result, result_details, result_dat
                 cur.execute(outbreak_sql, (outbreak_id,))
             
             conn.commit()
+            get_all_samples.clear()
         return True, f"Result for sample {sample_id} submitted successfully."
     except Exception as e:
         conn.rollback()
         return False, f"Database transaction failed: {e}"
+    finally:
+        put_db_connection(conn)
     
 # ... (keep all existing functions) ...
 
@@ -485,7 +732,10 @@ def get_surveillance_performance_data():
     except Exception as e:
         st.error(f"Error fetching performance data: {e}")
         return pd.DataFrame(), None
+    finally:
+        put_db_connection(conn)
 
+@st.cache_data(ttl=3600) # Cache for 1 hour
 def get_historical_hotspots(disease_name):
     """
     Fetches aggregated case data for a specific disease to be used in
@@ -500,12 +750,14 @@ def get_historical_hotspots(disease_name):
             a.woreda_code,
             a.woreda_name,
             a.geom,
+            a.centroid_lat,
+            a.centroid_lon,
             COALESCE(SUM(oc.cases), 0) as total_cases
         FROM admin_woredas a
         LEFT JOIN outbreaks o ON a.woreda_code = o.woreda_code AND o.status IN ('Completed', 'Confirmed')
         LEFT JOIN diseases d ON o.disease_code = d.disease_code AND d.disease_name = %(disease)s
         LEFT JOIN outbreak_cases oc ON o.outbreak_id = oc.outbreak_id
-        GROUP BY a.woreda_code, a.woreda_name, a.geom;
+        GROUP BY a.woreda_code, a.woreda_name, a.geom, a.centroid_lat, a.centroid_lon;
     """
     try:
         gdf = gpd.read_postgis(sql, conn, geom_col='geom', params={'disease': disease_name})
@@ -513,6 +765,8 @@ def get_historical_hotspots(disease_name):
     except Exception as e:
         st.error(f"Error fetching historical hotspot data: {e}")
         return gpd.GeoDataFrame()
+    finally:
+        put_db_connection(conn)
 
 # ... (keep all existing functions) ...
 
@@ -529,6 +783,8 @@ def get_inventory_data():
     except Exception as e:
         st.error(f"Error fetching inventory data: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 def get_personnel_data():
     """Fetches the complete roster of all veterinary personnel."""
@@ -541,6 +797,8 @@ def get_personnel_data():
     except Exception as e:
         st.error(f"Error fetching personnel data: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 def update_inventory_item(item_id, new_quantity):
     """Updates the quantity of a specific inventory item."""
@@ -555,6 +813,8 @@ def update_inventory_item(item_id, new_quantity):
     except Exception as e:
         conn.rollback()
         return False, f"Database error: {e}"
+    finally:
+        put_db_connection(conn)
 
 def update_personnel_status(personnel_id, new_status):
     """Updates the status of a personnel member (e.g., to 'Deployed')."""
@@ -569,6 +829,8 @@ def update_personnel_status(personnel_id, new_status):
     except Exception as e:
         conn.rollback()
         return False, f"Database error: {e}"
+    finally:
+        put_db_connection(conn)
 
 # ... (keep all existing functions) ...
 
@@ -583,6 +845,8 @@ def get_cases_for_outbreak(outbreak_id):
     except Exception as e:
         st.error(f"Error fetching case data for outbreak {outbreak_id}: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 # ... (keep all existing functions) ...
 
@@ -624,6 +888,8 @@ def get_movement_network_data(start_date, end_date, species):
     except Exception as e:
         st.error(f"Error fetching movement network data: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 # ... (keep all existing functions) ...
 
@@ -665,6 +931,8 @@ def get_molecular_surveillance_data():
     except Exception as e:
         st.error(f"Error fetching molecular data: {e}")
         return pd.DataFrame()
+    finally:
+        put_db_connection(conn)
 
 # ... (keep all existing functions) ...
 
@@ -687,6 +955,8 @@ def log_communication_activity(outbreak_id, activity_type, audience, message, da
     except Exception as e:
         conn.rollback()
         return False, f"Database error: {e}"
+    finally:
+        put_db_connection(conn)
 
 @st.cache_data(ttl=300) # Cache for 5 minutes
 def get_public_outbreak_map_data():
@@ -715,4 +985,6 @@ def get_public_outbreak_map_data():
     except Exception as e:
         st.error(f"Error fetching public map data: {e}")
         return gpd.GeoDataFrame()
+    finally:
+        put_db_connection(conn)
 
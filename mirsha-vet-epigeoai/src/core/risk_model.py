@@ -1,18 +1,24 @@
 import pandas as pd
 import geopandas as gpd
 import streamlit as st
+from src.core import database as db
 
-RISK_DATA_PATH = "data/external/risk_factors/woreda_risk_factors.gpkg"
+RISK_DATA_TABLE = "woreda_risk_factors"
 
 @st.cache_data
 def load_risk_factor_data():
-    """Loads the pre-generated risk factor GeoDataFrame."""
+    """Loads the pre-generated risk factor GeoDataFrame from PostGIS."""
+    conn = db.get_db_connection()
+    if not conn:
+        return gpd.GeoDataFrame()
     try:
-        gdf = gpd.read_file(RISK_DATA_PATH)
+        gdf = gpd.read_postgis(f"SELECT * FROM {RISK_DATA_TABLE};", conn, geom_col='geom')
         return gdf
     except Exception as e:
-        st.error(f"Error loading risk factor data from '{RISK_DATA_PATH}'. Did you run the generation script? Details: {e}")
+        st.error(f"Error loading risk factor data from '{RISK_DATA_TABLE}'. Did you run the generation script? Details: {e}")
         return gpd.GeoDataFrame()
+    finally:
+        db.put_db_connection(conn)
 
 def calculate_weighted_risk(risk_gdf, weights_dict):
     """
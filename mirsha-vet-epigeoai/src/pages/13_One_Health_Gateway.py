@@ -50,6 +50,8 @@ with tab1:
                 st.warning("Please copy this key and share it with the partner. It will not be shown again.")
             except Exception as e:
                 st.error(f"Failed to save key to database. Partner name might already exist. Error: {e}")
+            finally:
+                db.put_db_connection(conn)
         else:
             st.error("Database connection failed.")
 
@@ -57,7 +59,10 @@ with tab1:
     # Fetch and display existing keys
     conn = db.get_db_connection()
     if conn:
-        active_keys_df = pd.read_sql("SELECT key_id, partner_name, permissions, is_active, created_at FROM api_keys", conn)
+        try:
+            active_keys_df = pd.read_sql("SELECT key_id, partner_name, permissions, is_active, created_at FROM api_keys", conn)
+        finally:
+            db.put_db_connection(conn)
         st.dataframe(active_keys_df, use_container_width=True)
 
 
@@ -80,7 +85,10 @@ with tab2:
             JOIN admin_woredas a ON o.woreda_code = a.woreda_code
             WHERE o.status = 'Confirmed' AND d.disease_name = ANY(%s);
         """
-        return gpd.read_postgis(sql, conn, geom_col='geom', params=(ZOONOTIC_DISEASES,))
+        try:
+            return gpd.read_postgis(sql, conn, geom_col='geom', params=(ZOONOTIC_DISEASES,))
+        finally:
+            db.put_db_connection(conn)
 
     animal_gdf = get_zoonotic_animal_data()
     
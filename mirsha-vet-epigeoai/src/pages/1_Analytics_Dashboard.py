@@ -1,8 +1,10 @@
+import copy
 import streamlit as st
 import pandas as pd
+import numpy as np
 import folium
-from streamlit_folium import st_folium
-import matplotlib.pyplot as plt
+import pydeck as pdk
+import streamlit.components.v1 as components
 from src.core import database as db
 from src.core import analysis as an
 
@@ -11,6 +13,39 @@ st.set_page_config(page_title="Analytics Dashboard", page_icon="🌍", layout="w
 st.title("🌍 National Surveillance Dashboard (Module 4)")
 st.markdown("Analyze national animal health data through interactive maps, charts, and spatial statistics.")
 
+@st.cache_resource
+def _base_map(center_key, zoom):
+    """Builds the tiled base map once per (rounded center, zoom)."""
+    return folium.Map(location=list(center_key), zoom_start=zoom, tiles="CartoDB positron")
+
+def new_base_map(center, zoom=6):
+    """Returns a private copy of the cached base map that layers can be added to."""
+    # Deep copy so per-rerun layers never leak into the cached map
+    return copy.deepcopy(_base_map((round(center[0], 1), round(center[1], 1)), zoom))
+
+@st.cache_data(ttl=600) # Same lifetime as the cached dashboard data it is built from
+def render_choropleth_html(selected_disease, metric_to_map, metric_column, _summary_gdf, _geoms_gdf, _map_center):
+    """
+    Builds the choropleth for a (disease, metric) selection and returns its HTML.
+    Underscored arguments are not hashed: the cache is keyed on the selection only.
+    """
+    m_choro = new_base_map(_map_center)
+
+    # Only the join key and geometry are serialized to GeoJSON; the metric
+    # values are passed separately through `data`
+    folium.Choropleth(
+        geo_data=_geoms_gdf[['woreda_code', 'geom']],
+        data=_summary_gdf[['woreda_code', metric_column]],
+        columns=['woreda_code', metric_column],
+        key_on='feature.properties.woreda_code',
+        fill_color='YlOrRd',
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        legend_name=f"{metric_to_map} for {selected_disease}"
+    ).add_to(m_choro)
+
+    return m_choro.get_root().render()
+
 # --- Load Data ---
 # This function is cached, so it only runs once per session unless the cache is cleared.
 woredas_gdf, outbreaks_gdf = db.get_dashboard_data()
@@ -21,22 +56,25 @@ if woredas_gdf.empty:
 
 # --- Sidebar Filters ---
 st.sidebar.header("Dashboard Filters")
-disease_list = ["All"] + sorted(woredas_gdf['disease_name'].dropna().unique().tolist())
+disease_list = ["All"] + list(woredas_gdf['disease_name'].cat.categories)
 selected_disease = st.sidebar.selectbox("Filter by Disease", disease_list)
 
 # Filter the data based on selection
 if selected_disease == "All":
-    # Aggregate data across all diseases for each woreda
-    woreda_summary = woredas_gdf.groupby('woreda_code').agg({
-        'woreda_name': 'first', 'geom': 'first', 'total_cases': 'sum',
-        'total_deaths': 'sum', 'total_susceptible': 'sum'
-    }).reset_index()
-    woreda_summary_gdf = gpd.GeoDataFrame(woreda_summary, geometry='geom', crs="EPSG:4326")
+    # Per-woreda totals across all diseases are aggregated in the database
+    woreda_summary_gdf = db.get_woreda_summary()
     point_display_gdf = outbreaks_gdf
 else:
     woreda_summary_gdf = woredas_gdf[woredas_gdf['disease_name'] == selected_disease]
     point_display_gdf = outbreaks_gdf[outbreaks_gdf['disease_name'] == selected_disease]
 
+# Simplified outlines (cached) are used for drawing; analysis keeps full geometries
+display_geoms_gdf = db.get_display_woreda_geometries()
+if display_geoms_gdf.empty:
+    st.error("Could not load woreda outlines from the database. Please check the connection and ensure boundaries are loaded.")
+    st.stop()
+display_geoms_gdf = display_geoms_gdf[display_geoms_gdf['woreda_code'].isin(woreda_summary_gdf['woreda_code'])]
+
 # --- Main Page Layout with Tabs ---
 tab1, tab2, tab3 = st.tabs(["Choropleth Map (Rates)", "Hotspot Analysis (LISA)", "Temporal Analysis (Epi Curve)"])
 
@@ -56,21 +94,19 @@ with tab1:
     }
     metric_column = metric_column_map[metric_to_map]
 
-    map_center = [woredas_gdf.unary_union.centroid.y, woredas_gdf.unary_union.centroid.x]
-    m_choro = folium.Map(location=map_center, zoom_start=6, tiles="CartoDB positron")
-
-    folium.Choropleth(
-        geo_data=woreda_summary_gdf.to_json(),
-        data=woreda_summary_gdf,
-        columns=['woreda_code', metric_column],
-        key_on='feature.properties.woreda_code',
-        fill_color='YlOrRd',
-        fill_opacity=0.7,
-        line_opacity=0.2,
-        legend_name=f"{metric_to_map} for {selected_disease}"
-    ).add_to(m_choro)
-
-    st_folium(m_choro, use_container_width=True, height=600)
+    # Center on the bounding box: a bounds scan instead of dissolving every polygon
+    min_lon, min_lat, max_lon, max_lat = woredas_gdf.total_bounds
+    map_center = [(min_lat + max_lat) / 2, (min_lon + max_lon) / 2]
+
+    # The map is display-only, so repeat selections reuse the cached HTML instead
+    # of rebuilding the map through st_folium
+    components.html(
+        render_choropleth_html(
+            selected_disease, metric_to_map, metric_column,
+            woreda_summary_gdf, display_geoms_gdf, map_center
+        ),
+        height=600
+    )
 
 # --- Tab 2: Hotspot Analysis (LISA) ---
 with tab2:
@@ -80,31 +116,49 @@ with tab2:
     # Run LISA analysis
     lisa_gdf = an.calculate_lisa(woreda_summary_gdf, 'total_cases')
 
-    m_lisa = folium.Map(location=map_center, zoom_start=6, tiles="CartoDB positron")
-
-    # Define colors for cluster types
-    cluster_colors = {
-        'High-High (Hotspot)': 'red',
-        'Low-Low (Coldspot)': 'blue',
-        'High-Low (Diamond)': 'orange',
-        'Low-High (Doughnut)': 'yellow',
-        'Not Significant': 'lightgray'
+    # Define RGB fill colors for cluster types
+    cluster_colors_rgb = {
+        'High-High (Hotspot)': [255, 0, 0],
+        'Low-Low (Coldspot)': [0, 0, 255],
+        'High-Low (Diamond)': [255, 165, 0],
+        'Low-High (Doughnut)': [255, 255, 0],
+        'Not Significant': [211, 211, 211]
     }
 
-    # Add styled GeoJSON layer for LISA results
-    folium.GeoJson(
-        lisa_gdf,
-        style_function=lambda feature: {
-            'fillColor': cluster_colors.get(feature['properties']['cluster_type'], 'gray'),
-            'color': 'black',
-            'weight': 0.5,
-            'fillOpacity': 0.7 if feature['properties']['cluster_type'] != 'Not Significant' else 0.2
-        },
-        tooltip=folium.GeoJsonTooltip(fields=['woreda_name', 'total_cases', 'cluster_type']),
-        name='LISA Clusters'
-    ).add_to(m_lisa)
-    
-    st_folium(m_lisa, use_container_width=True, height=600)
+    # Draw the LISA results on the simplified display outlines
+    lisa_display_gdf = display_geoms_gdf.merge(
+        lisa_gdf[['woreda_code', 'woreda_name', 'total_cases', 'cluster_type']],
+        on='woreda_code'
+    )
+
+    # Precompute per-feature fill colors in one vectorized pass: labels are looked
+    # up explicitly in the palette, anything else (e.g. "Analysis Error") falls back
+    # to the gray last row, and opacity is 0.7 for significant clusters and 0.2 otherwise
+    palette = np.array(list(cluster_colors_rgb.values()) + [[128, 128, 128]], dtype=np.uint8)
+    palette_index = {label: i for i, label in enumerate(cluster_colors_rgb)}
+    cluster_codes = (
+        lisa_display_gdf['cluster_type'].map(palette_index)
+        .fillna(len(palette) - 1).to_numpy(dtype=np.intp)
+    )
+    fill_alpha = np.where(lisa_display_gdf['cluster_type'] != 'Not Significant', 178, 51).astype(np.uint8)
+    lisa_display_gdf['fill_rgba'] = np.column_stack([palette[cluster_codes], fill_alpha]).tolist()
+
+    # Render the LISA layer with deck.gl so polygons are drawn on the client GPU
+    lisa_layer = pdk.Layer(
+        'GeoJsonLayer',
+        data=lisa_display_gdf.__geo_interface__,
+        get_fill_color='properties.fill_rgba',
+        get_line_color=[0, 0, 0],
+        line_width_min_pixels=0.5,
+        pickable=True
+    )
+    st.pydeck_chart(pdk.Deck(
+        layers=[lisa_layer],
+        initial_view_state=pdk.ViewState(latitude=map_center[0], longitude=map_center[1], zoom=6),
+        map_provider="carto",
+        map_style="light",
+        tooltip={"html": "<b>{woreda_name}</b><br>Total cases: {total_cases}<br>{cluster_type}"}
+    ), use_container_width=True)
 
 # --- Tab 3: Temporal Analysis ---
 with tab3:
@@ -114,7 +168,9 @@ with tab3:
         
         # Resample data by week to create the epi curve
         epi_curve_data = point_display_gdf.set_index('investigation_date').resample('W')['outbreak_id'].count()
-        
+
+        # matplotlib is only needed for the epi curve, so its import is deferred to here
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(12, 6))
         epi_curve_data.plot(kind='bar', ax=ax, color='teal')
         ax.set_title(f"Epidemic Curve: Weekly New Outbreak Reports for {selected_disease}")
@@ -28,7 +28,14 @@ assigned_outbreaks = db.get_assigned_outbreaks(CURRENT_INVESTIGATOR)
 if assigned_outbreaks.empty:
     st.info("You have no pending investigations assigned to you. Well done!")
 else:
-    outbreak_options = {f"ID: {row.outbreak_id} - {row.woreda_name} ({row.report_date})": row.outbreak_id for index, row in assigned_outbreaks.iterrows()}
+    outbreak_options = {
+        f"ID: {o_id} - {woreda} ({r_date})": o_id
+        for o_id, woreda, r_date in zip(
+            assigned_outbreaks['outbreak_id'].tolist(),
+            assigned_outbreaks['woreda_name'].tolist(),
+            assigned_outbreaks['report_date'].tolist()
+        )
+    }
     selected_option = st.selectbox("Select an Outbreak to Investigate", options=["--Select--"] + list(outbreak_options.keys()))
 
     if selected_option != "--Select--":
@@ -56,11 +63,15 @@ else:
             # Section 3: List of Cases (Line Listing)
             st.subheader("Section 3: List of Cases (Line Listing)")
             st.markdown("Add a row for each group of animals (e.g., by species).")
-            case_data = pd.DataFrame(
-                [
-                    {"Species": SPECIES_LIST[0], "Susceptible": 0, "Cases": 0, "Deaths": 0, "Date": datetime.date.today()}
-                ]
-            )
+            # Typed (categorical / pyarrow-backed) columns keep the editor's
+            # round-trips in Arrow instead of object-dtype rows
+            case_data = pd.DataFrame({
+                "Species": pd.Categorical([SPECIES_LIST[0]], categories=SPECIES_LIST),
+                "Susceptible": pd.array([0], dtype="int32[pyarrow]"),
+                "Cases": pd.array([0], dtype="int32[pyarrow]"),
+                "Deaths": pd.array([0], dtype="int32[pyarrow]"),
+                "Date": pd.array([datetime.date.today()], dtype="date32[pyarrow]"),
+            })
             line_list_df = st.data_editor(
                 case_data, 
                 num_rows="dynamic",
@@ -79,7 +90,12 @@ else:
             selected_signs = st.multiselect("Observed Clinical Signs", options=CLINICAL_SIGNS_LIST)
             
             st.markdown("**4.3 Sample Collection**")
-            sample_data = pd.DataFrame(columns=["Field ID", "Sample Type", "Laboratory", "Submission Date"])
+            sample_data = pd.DataFrame({
+                "Field ID": pd.array([], dtype="string[pyarrow]"),
+                "Sample Type": pd.Categorical([], categories=SAMPLE_TYPES),
+                "Laboratory": pd.Categorical([], categories=LABORATORIES),
+                "Submission Date": pd.array([], dtype="date32[pyarrow]"),
+            })
             samples_df = st.data_editor(
                 sample_data, 
                 num_rows="dynamic",
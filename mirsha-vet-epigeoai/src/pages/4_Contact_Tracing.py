@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 import folium
-from folium.plugins import AntPath
+from folium.plugins import FastMarkerCluster
 from streamlit_folium import st_folium
 import datetime
 from src.core import database as db
@@ -20,6 +20,7 @@ DISEASE_INCUBATION = { # In days, for the tracing window calculator
     "Anthrax": 7,
     "Default": 21
 }
+FAST_CLUSTER_THRESHOLD = 50 # Above this many links, markers are clustered client-side
 
 # --- Main Logic ---
 outbreaks_to_trace = db.get_outbreaks_for_tracing()
@@ -29,8 +30,13 @@ if outbreaks_to_trace.empty:
 else:
     # Create a user-friendly list for the selectbox
     outbreak_options = {
-        f"ID: {row.outbreak_id} - {row.disease_name} in {row.woreda_name} ({row.investigation_date})": row.outbreak_id 
-        for index, row in outbreaks_to_trace.iterrows()
+        f"ID: {o_id} - {disease} in {woreda} ({i_date})": o_id
+        for o_id, disease, woreda, i_date in zip(
+            outbreaks_to_trace['outbreak_id'].tolist(),
+            outbreaks_to_trace['disease_name'].tolist(),
+            outbreaks_to_trace['woreda_name'].tolist(),
+            outbreaks_to_trace['investigation_date'].tolist()
+        )
     }
     selected_option = st.selectbox("Select an Outbreak to Trace", options=["--Select--"] + list(outbreak_options.keys()))
 
@@ -73,26 +79,51 @@ else:
                 icon=folium.Icon(color='red', icon='star')
             ).add_to(m)
 
-            # Add existing links to the map
-            for _, link in tracing_links_df.iterrows():
-                link_color = 'blue' if link['direction'] == 'Trace-back' else 'orange'
-                
-                # Marker for the linked location
-                folium.Marker(
-                    location=[link['latitude'], link['longitude']],
-                    popup=f"<strong>{link['linked_location_name']}</strong><br>Type: {link['contact_type']}<br>Date: {link['contact_date']}",
-                    tooltip=link['linked_location_name'],
-                    icon=folium.Icon(color=link_color, icon='info-sign')
-                ).add_to(m)
-                
-                # Animated path from index case to link
-                path = AntPath(
-                    locations=[map_center, [link['latitude'], link['longitude']]],
-                    color=link_color,
-                    dash_array=[10, 20],
-                    weight=3
-                )
-                path.add_to(m)
+            # Add existing links to the map. Markers go into a single FeatureGroup and
+            # links are drawn as one multi-segment PolyLine per direction, instead of
+            # one Marker + AntPath object per link.
+            mappable_links = tracing_links_df.dropna(subset=['latitude', 'longitude'])
+            if not mappable_links.empty:
+                locs = mappable_links[['latitude', 'longitude']].to_numpy(dtype=float)
+                is_trace_back = (mappable_links['direction'] == 'Trace-back').to_numpy()
+                link_colors = ['blue' if back else 'orange' for back in is_trace_back]
+
+                if len(locs) > FAST_CLUSTER_THRESHOLD:
+                    # Large link sets are clustered client-side instead of one marker each
+                    FastMarkerCluster(locs.tolist(), name="Linked Locations").add_to(m)
+                else:
+                    link_markers = folium.FeatureGroup(name="Linked Locations")
+                    popups = [
+                        f"<strong>{name}</strong><br>Type: {c_type}<br>Date: {c_date}"
+                        for name, c_type, c_date in zip(
+                            mappable_links['linked_location_name'].to_numpy(),
+                            mappable_links['contact_type'].to_numpy(),
+                            mappable_links['contact_date'].to_numpy()
+                        )
+                    ]
+                    for (lat, lon), color, popup, name in zip(
+                        locs, link_colors, popups, mappable_links['linked_location_name'].to_numpy()
+                    ):
+                        folium.CircleMarker(
+                            location=(lat, lon),
+                            radius=7,
+                            color=color,
+                            fill=True,
+                            fill_opacity=0.8,
+                            popup=popup,
+                            tooltip=name
+                        ).add_to(link_markers)
+                    link_markers.add_to(m)
+
+                # One PolyLine per direction carrying every index -> link segment
+                for mask, color in ((is_trace_back, 'blue'), (~is_trace_back, 'orange')):
+                    if mask.any():
+                        folium.PolyLine(
+                            [[map_center, [lat, lon]] for lat, lon in locs[mask]],
+                            color=color,
+                            weight=3,
+                            dash_array='10, 20'
+                        ).add_to(m)
 
             st_folium(m, use_container_width=True, height=600)
 
@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import datetime
+import hashlib
+import orjson
 from src.core import database as db
 
 st.set_page_config(page_title="PE Toolkit", page_icon="👥", layout="wide")
@@ -23,6 +25,34 @@ woreda_name = st.sidebar.selectbox("Woreda", options=WOREDA_LIST)
 outbreak_id_input = st.sidebar.text_input("Link to Outbreak ID (Optional)")
 outbreak_id = int(outbreak_id_input) if outbreak_id_input.isdigit() else None
 
+def save_pe_session_once(method, woreda_code, payload_bytes):
+    """
+    Saves a serialized PE payload unless the identical session was already saved.
+    Streamlit reruns the script on every interaction, so the hash of the last
+    successful save is kept in session_state as an idempotency key.
+    """
+    payload_hash = hashlib.blake2b(
+        orjson.dumps([method, woreda_code, str(session_date), outbreak_id]) + payload_bytes,
+        digest_size=8
+    ).hexdigest()
+    if st.session_state.get("last_pe_hash") == payload_hash:
+        st.info("These results have already been saved for this session.")
+        return
+
+    success, message = db.save_pe_session_results(
+        outbreak_id=outbreak_id,
+        woreda_code=woreda_code,
+        session_date=session_date,
+        facilitator=CURRENT_FACILITATOR,
+        method=method,
+        data_payload_json=payload_bytes
+    )
+    if success:
+        st.session_state["last_pe_hash"] = payload_hash
+        st.success(message)
+    else:
+        st.error(message)
+
 
 # --- Main Page Layout with Tabs for each PE Method ---
 tab1, tab2, tab3 = st.tabs(["Proportional Piling", "Matrix Scoring", "Semi-Structured Interview Guide"])
@@ -58,27 +88,16 @@ with tab1:
             
             # --- Save to Database ---
             with st.spinner("Saving results..."):
-                # Convert dataframe to a dictionary for JSONB storage
-                data_payload = {
+                # Store the table as an Arrow IPC blob inside the JSONB wrapper
+                payload_bytes = orjson.dumps({
                     "question": piling_question,
-                    "results": edited_piling_df.to_dict('records')
-                }
+                    "arrow_b64": db.encode_pe_table(edited_piling_df)
+                })
                 # Get woreda code
                 # In a real app, you would fetch this from a dropdown map
                 woreda_code_placeholder = "ET_W_001" 
                 
-                success, message = db.save_pe_session_results(
-                    outbreak_id=outbreak_id,
-                    woreda_code=woreda_code_placeholder,
-                    session_date=session_date,
-                    facilitator=CURRENT_FACILITATOR,
-                    method="Proportional Piling",
-                    data_payload=data_payload
-                )
-                if success:
-                    st.success(message)
-                else:
-                    st.error(message)
+                save_pe_session_once("Proportional Piling", woreda_code_placeholder, payload_bytes)
 
 # --- Tab 2: Matrix Scoring ---
 with tab2:
@@ -103,24 +122,15 @@ with tab2:
 
             # --- Save to Database ---
             with st.spinner("Saving results..."):
-                data_payload = {
+                # The matrix (signs as index) travels as an Arrow IPC blob; orjson
+                # only has to serialize the small JSON wrapper around it
+                payload_bytes = orjson.dumps({
                     "diseases": diseases_to_score,
                     "signs": signs_to_score,
-                    "matrix": edited_matrix_df.to_dict('index')
-                }
+                    "arrow_b64": db.encode_pe_table(edited_matrix_df)
+                })
                 woreda_code_placeholder = "ET_W_001" 
-                success, message = db.save_pe_session_results(
-                    outbreak_id=outbreak_id,
-                    woreda_code=woreda_code_placeholder,
-                    session_date=session_date,
-                    facilitator=CURRENT_FACILITATOR,
-                    method="Matrix Scoring",
-                    data_payload=data_payload
-                )
-                if success:
-                    st.success(message)
-                else:
-                    st.error(message)
+                save_pe_session_once("Matrix Scoring", woreda_code_placeholder, payload_bytes)
 
 # --- Tab 3: Semi-Structured Interview Guide ---
 with tab3:
@@ -143,17 +153,6 @@ with tab3:
     if st.button("Save Interview Notes"):
         # --- Save to Database ---
         with st.spinner("Saving results..."):
-            data_payload = {"notes": interview_notes}
+            payload_bytes = orjson.dumps({"notes": interview_notes})
             woreda_code_placeholder = "ET_W_001"
-            success, message = db.save_pe_session_results(
-                outbreak_id=outbreak_id,
-                woreda_code=woreda_code_placeholder,
-                session_date=session_date,
-                facilitator=CURRENT_FACILITATOR,
-                method="Semi-Structured Interview",
-                data_payload=data_payload
-            )
-            if success:
-                st.success(message)
-            else:
-                st.error(message)
\ No newline at end of file
+            save_pe_session_once("Semi-Structured Interview", woreda_code_placeholder, payload_bytes)
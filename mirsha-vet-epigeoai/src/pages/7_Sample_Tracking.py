@@ -7,11 +7,20 @@ st.set_page_config(page_title="Sample Tracking", page_icon="🔬", layout="wide"
 st.title("🔬 Sample Tracking Dashboard (Module 7)")
 st.markdown("Monitor the status of all submitted samples from the field to the laboratory.")
 
+# --- Status Colors for the Sample Log ---
+STATUS_STYLES = {
+    'Results Available': 'background-color: lightgreen',
+    'Collected': 'background-color: lightyellow',
+    'In Transit': 'background-color: lightyellow',
+    'Rejected': 'background-color: lightcoral',
+}
+DEFAULT_STATUS_STYLE = 'background-color: white'
+
 # --- Load Data ---
 samples_df = db.get_all_samples()
 
 if st.button("🔄 Refresh Sample List"):
-    st.cache_data.clear() # Clear the cache for the db function
+    db.get_all_samples.clear() # Only drop the cached sample list, not every page's caches
     st.experimental_rerun()
 
 if samples_df.empty:
@@ -28,20 +37,13 @@ else:
     # --- Full Sample Log ---
     st.subheader("Complete Sample Log")
     
-    # Create a styled dataframe for better readability
-    def style_status(status):
-        if status == 'Results Available':
-            color = 'lightgreen'
-        elif status == 'Collected' or status == 'In Transit':
-            color = 'lightyellow'
-        elif status == 'Rejected':
-            color = 'lightcoral'
-        else:
-            color = 'white'
-        return f'background-color: {color}'
-
+    # Create a styled dataframe for better readability. The whole status column
+    # is styled with one Series.map instead of a Python call per cell.
     st.dataframe(
-        samples_df.style.applymap(style_status, subset=['status']),
+        samples_df.style.apply(
+            lambda status: status.map(STATUS_STYLES).fillna(DEFAULT_STATUS_STYLE),
+            subset=['status']
+        ),
         use_container_width=True,
         height=500
     )
\ No newline at end of file
@@ -1,12 +1,18 @@
 import streamlit as st
 import pandas as pd
 import datetime
+import hmac
 from src.core import database as db
 
 st.set_page_config(page_title="Lab Results Entry", page_icon="🧪")
 
 # --- Password Protection (Simple Simulation) ---
 # In a real app, this would be a proper login system (e.g., OAuth)
+@st.cache_resource
+def get_lab_password():
+    """Reads the lab password from secrets once per process."""
+    return st.secrets.get("LAB_PASSWORD", "veteplab123") # Fallback for local dev
+
 def check_password():
     """Returns `True` if the user had the correct password."""
     if "password_correct" not in st.session_state:
@@ -15,11 +21,15 @@ def check_password():
     if st.session_state["password_correct"]:
         return True
 
-    # Show the password input
-    password = st.text_input("Enter Laboratory Access Password", type="password")
-    if password == st.secrets.get("LAB_PASSWORD", "veteplab123"): # Fallback for local dev
+    # Show the password input in a placeholder so it can be removed on success
+    # without forcing a full script rerun
+    password_box = st.empty()
+    password = password_box.text_input("Enter Laboratory Access Password", type="password")
+    # Constant-time comparison (bytes, so non-ASCII input cannot raise)
+    if password and hmac.compare_digest(password.encode("utf-8"), get_lab_password().encode("utf-8")):
         st.session_state["password_correct"] = True
-        st.experimental_rerun()
+        password_box.empty()
+        return True
     elif password:
         st.error("Password incorrect.")
     return False
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
 import geopandas as gpd
-import folium
-from streamlit_folium import st_folium
-import matplotlib.pyplot as plt
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pydeck as pdk
+import altair as alt
 from src.core import database as db
 
 st.set_page_config(page_title="Strategic Planner", page_icon="🧭", layout="wide")
@@ -11,6 +13,26 @@ st.set_page_config(page_title="Strategic Planner", page_icon="🧭", layout="wid
 st.title("🧭 Strategic Surveillance Planner (Module 8)")
 st.markdown("Design, monitor, and evaluate national surveillance programs using historical data and performance metrics.")
 
+@st.cache_data(max_entries=20) # Keyed on the frame's contents, so it follows the hotspot query's data
+def build_hotspot_layer_data(hotspot_gdf):
+    """
+    Prepares the GeoJSON features and map center for the historical cases layer.
+    The GeoDataFrame is hashed, so a refreshed hotspot query rebuilds the layer.
+    """
+    # Center on the mean of the precomputed woreda centroids (no geometry op needed)
+    map_center = [hotspot_gdf['centroid_lat'].mean(), hotspot_gdf['centroid_lon'].mean()]
+
+    # Precompute a white-to-red fill per woreda, scaled to the busiest woreda
+    layer_gdf = hotspot_gdf[['woreda_code', 'woreda_name', 'total_cases', 'geom']].copy()
+    cases = layer_gdf['total_cases'].to_numpy(dtype=float)
+    intensity = cases / cases.max() if cases.max() > 0 else np.zeros_like(cases)
+    green_blue = (255 * (1 - intensity)).astype(np.uint8)
+    layer_gdf['fill_rgba'] = np.column_stack([
+        np.full(len(cases), 255, dtype=np.uint8), green_blue, green_blue, np.full(len(cases), 204, dtype=np.uint8)
+    ]).tolist()
+
+    return layer_gdf.__geo_interface__, map_center
+
 # --- Main Page Layout with Tabs ---
 tab1, tab2 = st.tabs(["Surveillance Performance Dashboard", "Risk-Based Survey Planning Tool"])
 
@@ -37,13 +59,12 @@ with tab1:
         
         # Bar chart for total reports by region
         reports_by_region = performance_df.groupby('region_name')['total_reports'].sum().sort_values(ascending=False)
-        fig1, ax1 = plt.subplots(figsize=(10, 6))
-        reports_by_region.plot(kind='bar', ax=ax1, color='skyblue')
-        ax1.set_title("Total Outbreak Reports per Region")
-        ax1.set_ylabel("Number of Reports")
-        ax1.set_xlabel("Region")
-        plt.xticks(rotation=45, ha='right')
-        st.pyplot(fig1)
+        # Rendered client-side by Vega-Lite instead of rasterizing a matplotlib figure
+        reports_chart = alt.Chart(reports_by_region.reset_index()).mark_bar(color='skyblue').encode(
+            x=alt.X('region_name', sort='-y', title="Region", axis=alt.Axis(labelAngle=-45)),
+            y=alt.Y('total_reports', title="Number of Reports")
+        ).properties(title="Total Outbreak Reports per Region")
+        st.altair_chart(reports_chart, use_container_width=True)
 
         st.subheader("Detailed Woreda Performance Data")
         st.dataframe(performance_df, use_container_width=True)
@@ -67,22 +88,25 @@ with tab2:
         else:
             st.subheader(f"Historical Distribution of {selected_disease} Cases")
             
-            # Create a choropleth map of historical cases
-            map_center = [hotspot_gdf.unary_union.centroid.y, hotspot_gdf.unary_union.centroid.x]
-            m = folium.Map(location=map_center, zoom_start=6, tiles="CartoDB positron")
-
-            folium.Choropleth(
-                geo_data=hotspot_gdf.to_json(),
-                data=hotspot_gdf,
-                columns=['woreda_code', 'total_cases'],
-                key_on='feature.properties.woreda_code',
-                fill_color='Reds',
-                fill_opacity=0.8,
-                line_opacity=0.2,
-                legend_name=f'Total Historical Cases of {selected_disease}',
-            ).add_to(m)
-
-            st_folium(m, use_container_width=True, height=500)
+            # The layer data only depends on the hotspot frame, so threshold slider reruns reuse the cache
+            hotspot_geojson, map_center = build_hotspot_layer_data(hotspot_gdf)
+
+            # Render with deck.gl so the polygons are drawn on the client GPU
+            hotspot_layer = pdk.Layer(
+                'GeoJsonLayer',
+                data=hotspot_geojson,
+                get_fill_color='properties.fill_rgba',
+                get_line_color=[0, 0, 0],
+                line_width_min_pixels=0.5,
+                pickable=True
+            )
+            st.pydeck_chart(pdk.Deck(
+                layers=[hotspot_layer],
+                initial_view_state=pdk.ViewState(latitude=map_center[0], longitude=map_center[1], zoom=6),
+                map_provider="carto",
+                map_style="light",
+                tooltip={"html": f"<b>{{woreda_name}}</b><br>Total historical cases of {selected_disease}: {{total_cases}}"}
+            ), use_container_width=True)
             
             # --- Interactive Planning ---
             st.subheader("Define High-Risk Stratum")
@@ -97,20 +121,25 @@ with tab2:
                     value=max(1, int(max_cases * 0.5)) # Default to 50% of max
                 )
                 
-                # Filter to get the high-risk woredas
-                high_risk_woredas = hotspot_gdf[hotspot_gdf['total_cases'] >= threshold]
+                # Filter to get the high-risk woredas, sorted once for both the table and the CSV
+                high_risk_woredas = hotspot_gdf.loc[
+                    hotspot_gdf['total_cases'] >= threshold, ['woreda_name', 'woreda_code', 'total_cases']
+                ].sort_values(by='total_cases', ascending=False)
                 
                 st.metric("Number of Woredas in High-Risk Stratum", len(high_risk_woredas))
                 
                 st.markdown("**Sampling Frame for Risk-Based Survey:**")
                 st.dataframe(
-                    high_risk_woredas[['woreda_name', 'total_cases']].sort_values(by='total_cases', ascending=False),
+                    high_risk_woredas[['woreda_name', 'total_cases']],
                     use_container_width=True
                 )
                 
                 @st.cache_data
                 def convert_df_to_csv(df):
-                    return df.to_csv(index=False).encode('utf-8')
+                    # pyarrow's C++ CSV writer instead of pandas' Python-level writer
+                    buffer = pa.BufferOutputStream()
+                    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buffer)
+                    return buffer.getvalue().to_pybytes()
 
                 csv = convert_df_to_csv(high_risk_woredas[['woreda_name', 'woreda_code', 'total_cases']])
                 
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-import datetime
 import os
 
 # --- Configuration ---
@@ -10,6 +9,7 @@ START_DATE = "2020-01-01"
 END_DATE = "2023-12-31"
 OUTPUT_DIR = "data/raw/cases"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "dovar_ii_cases.csv")
+RANDOM_SEED = 42
 
 # --- Data Definitions (Based on Ethiopian Data Standard & Context) ---
 
@@ -47,6 +47,9 @@ def generate_mock_data():
     
     print(f"🔥 Generating {NUM_RECORDS} mock outbreak records...")
     
+    # One seeded Generator for all sampling (PCG64, no global-state lock)
+    rng = np.random.default_rng(RANDOM_SEED)
+
     # Prepare lists and weights for random selection
     disease_names = list(DISEASES.keys())
     disease_weights = [d['weight'] for d in DISEASES.values()]
@@ -55,54 +58,55 @@ def generate_mock_data():
     woreda_weights = np.array([w['hotspot_factor'] for w in WOREDAS.values()])
     woreda_probabilities = woreda_weights / woreda_weights.sum()
 
-    records = []
-    
     # Generate random dates
-    start_ts = pd.to_datetime(START_DATE).timestamp()
-    end_ts = pd.to_datetime(END_DATE).timestamp()
-    date_timestamps = np.random.randint(start_ts, end_ts, NUM_RECORDS)
-    random_dates = [datetime.date.fromtimestamp(ts) for ts in date_timestamps]
+    start_ts = int(pd.to_datetime(START_DATE).timestamp())
+    end_ts = int(pd.to_datetime(END_DATE).timestamp())
+    date_timestamps = rng.integers(start_ts, end_ts, NUM_RECORDS)
+    random_dates = pd.to_datetime(date_timestamps, unit='s').normalize()
+
+    # Select woredas and diseases based on weights (one draw per column)
+    woreda_idx = rng.choice(len(woreda_names), NUM_RECORDS, p=woreda_probabilities)
+    disease_idx = rng.choice(len(disease_names), NUM_RECORDS, p=disease_weights)
+
+    # Select a plausible species for each chosen disease: pick a random position
+    # within that disease's species list from a padded (disease x species) table
+    species_lists = [SPECIES_DISEASE_MAP[d] for d in disease_names]
+    max_species = max(len(sl) for sl in species_lists)
+    species_table = np.array([sl + [None] * (max_species - len(sl)) for sl in species_lists], dtype=object)
+    species_counts = np.array([len(sl) for sl in species_lists])[disease_idx]
+    species_idx = (rng.random(NUM_RECORDS) * species_counts).astype(int)
+    species = species_table[disease_idx, species_idx]
 
-    for i in range(NUM_RECORDS):
-        # Select woreda and disease based on weights
-        woreda_name = np.random.choice(woreda_names, p=woreda_probabilities)
-        disease_name = np.random.choice(disease_names, p=disease_weights)
-        
-        # Select a plausible species for the chosen disease
-        species = np.random.choice(SPECIES_DISEASE_MAP[disease_name])
-        
-        # Generate epidemiologically sound numbers
-        total_susceptible = np.random.randint(20, 501)
-        # Attack Rate between 1% and 40%
-        attack_rate = np.random.uniform(0.01, 0.40)
-        num_cases = max(1, int(total_susceptible * attack_rate))
-        # Case Fatality Rate between 0% and 30%
-        cfr = np.random.uniform(0.0, 0.30)
-        deaths = int(num_cases * cfr)
-        
-        # Add random jitter to coordinates
-        base_lat = WOREDAS[woreda_name]['lat']
-        base_lon = WOREDAS[woreda_name]['lon']
-        lat = base_lat + np.random.uniform(-0.05, 0.05)
-        lon = base_lon + np.random.uniform(-0.05, 0.05)
+    # Generate epidemiologically sound numbers
+    total_susceptible = rng.integers(20, 501, NUM_RECORDS)
+    # Attack Rate between 1% and 40%
+    attack_rate = rng.uniform(0.01, 0.40, NUM_RECORDS)
+    num_cases = np.maximum(1, (total_susceptible * attack_rate).astype(int))
+    # Case Fatality Rate between 0% and 30%
+    cfr = rng.uniform(0.0, 0.30, NUM_RECORDS)
+    deaths = (num_cases * cfr).astype(int)
 
-        records.append({
-            "report_date": random_dates[i],
-            "disease_name": disease_name,
-            "disease_code": DISEASES[disease_name]['code'],
-            "woreda_name": woreda_name,
-            "woreda_code": WOREDAS[woreda_name]['code'],
-            "species": species,
-            "total_susceptible": total_susceptible,
-            "cases": num_cases,
-            "deaths": deaths,
-            "latitude": round(lat, 6),
-            "longitude": round(lon, 6),
-            "complaint": f"Initial field report for suspected {disease_name} in {species}."
-        })
+    # Add random jitter to coordinates
+    base_lats = np.array([w['lat'] for w in WOREDAS.values()])[woreda_idx]
+    base_lons = np.array([w['lon'] for w in WOREDAS.values()])[woreda_idx]
+    lat = base_lats + rng.uniform(-0.05, 0.05, NUM_RECORDS)
+    lon = base_lons + rng.uniform(-0.05, 0.05, NUM_RECORDS)
 
-    # Create DataFrame and save
-    df = pd.DataFrame(records)
+    # Create DataFrame from the column arrays
+    df = pd.DataFrame({
+        "report_date": random_dates,
+        "disease_name": np.array(disease_names)[disease_idx],
+        "disease_code": np.array([d['code'] for d in DISEASES.values()])[disease_idx],
+        "woreda_name": np.array(woreda_names)[woreda_idx],
+        "woreda_code": np.array([w['code'] for w in WOREDAS.values()])[woreda_idx],
+        "species": species,
+        "total_susceptible": total_susceptible,
+        "cases": num_cases,
+        "deaths": deaths,
+        "latitude": np.round(lat, 6),
+        "longitude": np.round(lon, 6),
+    })
+    df["complaint"] = "Initial field report for suspected " + df["disease_name"] + " in " + df["species"] + "."
     
     # Ensure directory exists
     os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -3,10 +3,12 @@ import pandas as pd
 import numpy as np
 from src.core import database as db
 
+RISK_FACTORS_TABLE = "woreda_risk_factors"
+
 def generate_and_save_risk_data():
     """
     Fetches woreda geometries and generates random, plausible risk factor data
-    for demonstration purposes. Saves the result as a GeoPackage file.
+    for demonstration purposes. Writes the result back to PostGIS.
     """
     print("⏳ Generating simulated risk factor data...")
 
@@ -17,8 +19,10 @@ def generate_and_save_risk_data():
         return
 
     woredas_sql = "SELECT woreda_code, woreda_name, geom FROM admin_woredas;"
-    woredas_gdf = gpd.read_postgis(woredas_sql, conn, geom_col='geom')
-    conn.close()
+    try:
+        woredas_gdf = gpd.read_postgis(woredas_sql, conn, geom_col='geom')
+    finally:
+        db.put_db_connection(conn)
 
     if woredas_gdf.empty:
         print("❌ Woredas table is empty. Please load administrative boundaries first.")
@@ -26,22 +30,23 @@ def generate_and_save_risk_data():
 
     # --- Simulate Risk Factor Data ---
     num_woredas = len(woredas_gdf)
-    np.random.seed(42) # for reproducibility
-
-    # Normalize data to a 0-1 scale for easy weighting
-    woredas_gdf['cattle_density'] = np.random.rand(num_woredas)
-    woredas_gdf['proximity_to_market'] = np.random.rand(num_woredas) # Assume 0=very close, 1=far
-    woredas_gdf['proximity_to_road'] = np.random.rand(num_woredas)
-    woredas_gdf['rainfall_anomaly'] = np.random.uniform(-1, 1, num_woredas) # -1=dry, 1=wet
-    woredas_gdf['vegetation_index'] = np.random.rand(num_woredas) # NDVI
-
-    # --- Save to GeoPackage ---
-    output_path = "data/external/risk_factors/woreda_risk_factors.gpkg"
+    rng = np.random.default_rng(42) # for reproducibility
+
+    # Normalize data to a 0-1 scale for easy weighting; all five factors come
+    # from one (num_woredas, 5) draw
+    factors = rng.random((num_woredas, 5))
+    woredas_gdf['cattle_density'] = factors[:, 0]
+    woredas_gdf['proximity_to_market'] = factors[:, 1] # Assume 0=very close, 1=far
+    woredas_gdf['proximity_to_road'] = factors[:, 2]
+    woredas_gdf['vegetation_index'] = factors[:, 3] # NDVI
+    woredas_gdf['rainfall_anomaly'] = factors[:, 4] * 2 - 1 # -1=dry, 1=wet
+
+    # --- Save to PostGIS ---
     try:
-        woredas_gdf.to_file(output_path, driver="GPKG")
-        print(f"✅ Simulated risk factor data saved successfully to '{output_path}'")
+        woredas_gdf.to_postgis(RISK_FACTORS_TABLE, db.get_sqlalchemy_engine(), if_exists='replace', index=False, chunksize=1000)
+        print(f"✅ Simulated risk factor data saved successfully to the '{RISK_FACTORS_TABLE}' table")
     except Exception as e:
-        print(f"❌ Error saving GeoPackage file: {e}")
+        print(f"❌ Error saving risk factor data to PostGIS: {e}")
 
 if __name__ == "__main__":
     generate_and_save_risk_data()
\ No newline at end of file
@@ -2,7 +2,7 @@ import os
 import sys
 import geopandas as gpd
 import pandas as pd
-import zipfile
+import numpy as np
 
 # --- Configuration ---
 # Ensure the script can find the 'src' directory for imports
@@ -29,21 +29,19 @@ def process_data_pipeline():
     # --- Step 1: Load Raw Data ---
     print(f"⏳ Loading raw case data from '{RAW_CASES_PATH}'...")
     try:
-        cases_df = pd.read_csv(RAW_CASES_PATH)
-        cases_df['report_date'] = pd.to_datetime(cases_df['report_date'])
+        # Multithreaded Arrow CSV reader; dates are parsed inline and columns stay Arrow-backed
+        cases_df = pd.read_csv(RAW_CASES_PATH, engine='pyarrow', dtype_backend='pyarrow', parse_dates=['report_date'])
     except FileNotFoundError:
         print(f"❌ ERROR: Case data file not found. Please run 'generate_mock_cases.py' first.")
         sys.exit(1)
 
-    print(f"⏳ Loading and unzipping spatial data from '{RAW_GIS_ZIP_PATH}'...")
+    print(f"⏳ Loading spatial data directly from '{RAW_GIS_ZIP_PATH}'...")
     try:
-        unzip_dir = "data/raw/gis/temp_unzipped_shapefile"
-        with zipfile.ZipFile(RAW_GIS_ZIP_PATH, 'r') as zip_ref:
-            zip_ref.extractall(unzip_dir)
-        
-        shp_path = next((os.path.join(unzip_dir, f) for f in os.listdir(unzip_dir) if f.endswith('.shp')), None)
-        woredas_gdf = gpd.read_file(shp_path)
-    except (FileNotFoundError, StopIteration):
+        if not os.path.exists(RAW_GIS_ZIP_PATH):
+            raise FileNotFoundError(RAW_GIS_ZIP_PATH)
+        # Read the shapefile straight out of the archive (GDAL /vsizip/), no temp extraction
+        woredas_gdf = gpd.read_file(f"zip://{RAW_GIS_ZIP_PATH}", engine="pyogrio")
+    except FileNotFoundError:
         print(f"❌ ERROR: Shapefile data not found. Please run 'generate_gis_data.py' first.")
         sys.exit(1)
         
@@ -51,12 +49,14 @@ def process_data_pipeline():
 
     # --- Step 2: Aggregate Case Data ---
     print("⏳ Aggregating outbreak statistics by woreda...")
-    # Group by the woreda name from the case data to get total counts
-    woreda_summary = cases_df.groupby('woreda_name').agg(
+    # Group by the woreda name from the case data to get total counts. A categorical
+    # key lets pandas group on integer codes instead of hashing strings.
+    cases_df['woreda_name'] = cases_df['woreda_name'].astype('category')
+    woreda_summary = cases_df.groupby('woreda_name', observed=True).agg(
         total_cases=('cases', 'sum'),
         total_deaths=('deaths', 'sum'),
         total_susceptible=('total_susceptible', 'sum'),
-        outbreak_count=('report_date', 'count') # Count the number of distinct reports
+        outbreak_count=('cases', 'size') # Number of reports (row count, no NaN checks)
     ).reset_index()
     print("✅ Case data aggregated.")
 
@@ -74,21 +74,25 @@ def process_data_pipeline():
     analysis_gdf.drop(columns=['woreda_name'], inplace=True) # Drop redundant name column
     # Fill woredas with no reported outbreaks with 0
     fill_cols = ['total_cases', 'total_deaths', 'total_susceptible', 'outbreak_count']
-    analysis_gdf[fill_cols] = analysis_gdf[fill_cols].fillna(0).astype(int)
+    analysis_gdf[fill_cols] = analysis_gdf[fill_cols].to_numpy(dtype=np.int64, na_value=0)
     print("✅ Data merged successfully.")
 
     # --- Step 4: Calculate Derived Epidemiological Rates ---
     print("⏳ Calculating epidemiological rates...")
     
-    # Calculate Attack Rate, handling division by zero
-    analysis_gdf['attack_rate_percent'] = (
-        (analysis_gdf['total_cases'] / analysis_gdf['total_susceptible']) * 100
-    ).where(analysis_gdf['total_susceptible'] > 0, 0).round(2)
+    total_cases = analysis_gdf['total_cases'].to_numpy()
+    total_deaths = analysis_gdf['total_deaths'].to_numpy()
+    total_susceptible = analysis_gdf['total_susceptible'].to_numpy()
+
+    # Calculate Attack Rate, handling division by zero (rate stays 0 where there is no denominator)
+    attack_rate = np.zeros(len(analysis_gdf), dtype=np.float64)
+    np.divide(total_cases * 100.0, total_susceptible, out=attack_rate, where=total_susceptible > 0)
+    analysis_gdf['attack_rate_percent'] = np.round(attack_rate, 2)
     
     # Calculate Case Fatality Rate, handling division by zero
-    analysis_gdf['cfr_percent'] = (
-        (analysis_gdf['total_deaths'] / analysis_gdf['total_cases']) * 100
-    ).where(analysis_gdf['total_cases'] > 0, 0).round(2)
+    cfr = np.zeros(len(analysis_gdf), dtype=np.float64)
+    np.divide(total_deaths * 100.0, total_cases, out=cfr, where=total_cases > 0)
+    analysis_gdf['cfr_percent'] = np.round(cfr, 2)
     
     print("✅ Rates calculated.")
 
@@ -99,16 +103,10 @@ def process_data_pipeline():
     os.makedirs(PROCESSED_DIR, exist_ok=True)
     
     try:
-        analysis_gdf.to_file(PROCESSED_OUTPUT_PATH, driver="GPKG", layer="woreda_summary")
+        analysis_gdf.to_file(PROCESSED_OUTPUT_PATH, driver="GPKG", layer="woreda_summary", engine="pyogrio")
         print("🎉 Processing complete! Analysis-ready data is now available.")
     except Exception as e:
         print(f"❌ Failed to save GeoPackage file. Error: {e}")
-        
-    # --- Clean up unzipped files ---
-    for f in os.listdir(unzip_dir):
-        os.remove(os.path.join(unzip_dir, f))
-    os.rmdir(unzip_dir)
-    print("🗑️ Cleaned up temporary unzipped files.")
 
 
 if __name__ == "__main__":
@@ -1,23 +1,29 @@
 import os
 import sys
 import psycopg2
+from psycopg2.extras import execute_values
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import geopandas as gpd
+import shapely
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-import zipfile
 
 # --- Configuration ---
 # Add the project's root directory to the Python path to allow imports from `src`
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
-from src.core.database import get_db_connection
+from src.core.database import get_db_connection, put_db_connection, copy_dataframe
 
 # Define paths to data files
 SCHEMA_SQL_PATH = "schema.sql"
 CASES_CSV_PATH = "data/raw/cases/dovar_ii_cases.csv"
 WOREDAS_ZIP_PATH = "data/raw/gis/south_omo_woredas.zip"
+WOREDAS_SRID = 4326 # Must match admin_woredas.geom in schema.sql
+CASES_BLOCK_SIZE = 16 << 20 # Bytes of CSV parsed per streamed chunk (bounds memory on large files)
+# Pin the text columns so a chunk that happens to look numeric or empty cannot change their type
+CASES_COLUMN_TYPES = {'woreda_code': pa.string(), 'species': pa.string(), 'complaint': pa.string()}
 
 def execute_sql_from_file(conn, filepath):
     """Executes a SQL script file on the given database connection."""
@@ -25,60 +31,51 @@ def execute_sql_from_file(conn, filepath):
         sql_script = f.read()
     with conn.cursor() as cur:
         cur.execute(sql_script)
-    conn.commit()
     print(f"✅ SQL script '{filepath}' executed successfully.")
 
 def populate_diseases_table(conn, cases_df):
     """Populates the 'diseases' table from the unique diseases in the cases CSV."""
     print("⏳ Populating 'diseases' table...")
     
-    unique_diseases = cases_df[['disease_code', 'disease_name']].drop_duplicates().dropna()
+    # One grouping pass: the first name seen for each disease code
+    unique_diseases = (
+        cases_df.dropna(subset=['disease_code', 'disease_name'])
+        .groupby('disease_code', as_index=False, sort=False)['disease_name']
+        .first()
+    )
     
     # In a real system, etiology would be mapped, here we use a placeholder
     unique_diseases['etiology'] = 'Unknown'
     
     with conn.cursor() as cur:
-        for index, row in unique_diseases.iterrows():
-            # Use ON CONFLICT DO NOTHING to prevent errors if a disease already exists
-            cur.execute(
-                """
-                INSERT INTO diseases (disease_code, disease_name, etiology)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (disease_code) DO NOTHING;
-                """,
-                (row['disease_code'], row['disease_name'], row['etiology'])
-            )
-    conn.commit()
+        # One multi-row INSERT; ON CONFLICT DO NOTHING prevents errors if a disease already exists
+        execute_values(
+            cur,
+            """
+            INSERT INTO diseases (disease_code, disease_name, etiology)
+            VALUES %s
+            ON CONFLICT (disease_code) DO NOTHING;
+            """,
+            unique_diseases[['disease_code', 'disease_name', 'etiology']].itertuples(index=False, name=None),
+            page_size=1000
+        )
     print(f"✅ 'diseases' table populated with {len(unique_diseases)} unique diseases.")
 
 def populate_woredas_table(conn):
     """
-    Unzips the shapefile and loads the woreda geometries and names into the database.
-    Uses GeoPandas and SQLAlchemy for robust spatial data insertion.
+    Reads the zipped shapefile and loads the woreda geometries and names into the database.
+    Streams the rows with COPY on the caller's connection, so it joins the setup transaction.
     """
     print("⏳ Populating 'admin_woredas' table from shapefile...")
 
+    # Setup runs as one transaction, so fail loudly here rather than letting the
+    # outbreaks COPY trip over the woreda_code foreign key later
     if not os.path.exists(WOREDAS_ZIP_PATH):
-        print(f"❌ ERROR: Woreda zip file not found at '{WOREDAS_ZIP_PATH}'")
-        return
+        raise FileNotFoundError(f"Woreda zip file not found at '{WOREDAS_ZIP_PATH}'")
         
-    # Unzip the shapefile
-    unzip_dir = "data/raw/gis/temp_woreda_shapefile"
-    with zipfile.ZipFile(WOREDAS_ZIP_PATH, 'r') as zip_ref:
-        zip_ref.extractall(unzip_dir)
-        
-    shp_path = None
-    for file in os.listdir(unzip_dir):
-        if file.endswith('.shp'):
-            shp_path = os.path.join(unzip_dir, file)
-            break
-            
-    if not shp_path:
-        print("❌ No .shp file found in the zip archive.")
-        return
-
-    # Load shapefile into a GeoDataFrame
-    woredas_gdf = gpd.read_file(shp_path)
+    # Read the shapefile straight out of the zip archive (no temp directory on disk),
+    # columnar through pyogrio/Arrow rather than one Python dict per feature
+    woredas_gdf = gpd.read_file(f"zip://{WOREDAS_ZIP_PATH}", engine="pyogrio", use_arrow=True)
     
     # Standardize column names to match our schema (adjust as needed)
     # This is a common and crucial step
@@ -92,47 +89,82 @@ def populate_woredas_table(conn):
     # Ensure all required columns are present
     required_cols = ['woreda_code', 'woreda_name', 'geometry']
     if not all(col in woredas_gdf.columns for col in required_cols):
-        print(f"❌ Shapefile is missing required columns. Needs: {required_cols}. Found: {woredas_gdf.columns.tolist()}")
-        return
+        raise ValueError(f"Shapefile is missing required columns. Needs: {required_cols}. Found: {woredas_gdf.columns.tolist()}")
+
+    # Reproject to the column's SRID; a shapefile without a .prj cannot be placed safely
+    if woredas_gdf.crs is None:
+        raise ValueError("Woreda shapefile has no CRS (missing .prj); cannot reproject to EPSG:4326.")
+    woredas_gdf = woredas_gdf.to_crs(epsg=WOREDAS_SRID)
+
+    # admin_woredas.geom is MultiPolygon, so promote single-part polygons (type id 3)
+    geoms = woredas_gdf.geometry.to_numpy()
+    is_polygon = shapely.get_type_id(geoms) == 3
+    geoms[is_polygon] = shapely.multipolygons(geoms[is_polygon][:, None])
+
+    # Geometries travel as hex EWKB (with SRID), which PostGIS parses directly from COPY
+    woredas_df = pd.DataFrame({
+        'woreda_code': woredas_gdf['woreda_code'],
+        'woreda_name': woredas_gdf['woreda_name'],
+        'zone_name': woredas_gdf['zone_name'],
+        'region_name': woredas_gdf['region_name'],
+        'geom': shapely.to_wkb(
+            shapely.set_srid(geoms, WOREDAS_SRID), hex=True, include_srid=True
+        )
+    })
+    # Build the GIST index once over the loaded boundaries instead of maintaining it row by row
+    with conn.cursor() as cur:
+        cur.execute("DROP INDEX IF EXISTS woredas_geom_idx;")
+    copy_dataframe(conn, woredas_df, 'admin_woredas', freeze=True)
+    with conn.cursor() as cur:
+        cur.execute("CREATE INDEX woredas_geom_idx ON admin_woredas USING GIST (geom);")
+        cur.execute("ANALYZE admin_woredas;")
+    print(f"✅ 'admin_woredas' table populated with {len(woredas_gdf)} geometries.")
 
-    # Create a SQLAlchemy engine for GeoPandas to use
-    db_url = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@db:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-    engine = create_engine(db_url)
-    
-    # Use to_sql to insert the GeoDataFrame into the PostGIS table
-    woredas_gdf[required_cols + ['zone_name', 'region_name']].to_sql(
-        'admin_woredas',
-        engine,
-        if_exists='append', # Use 'append' as the table already exists
-        index=False,
-        dtype={'geom': 'geometry'}
+def read_case_columns(columns):
+    """Reads only the given columns of the cases CSV into an Arrow-backed DataFrame."""
+    table = pacsv.read_csv(CASES_CSV_PATH, convert_options=pacsv.ConvertOptions(include_columns=columns))
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def iter_case_chunks():
+    """Streams the cases CSV as Arrow-backed DataFrames of about CASES_BLOCK_SIZE bytes each."""
+    reader = pacsv.open_csv(
+        CASES_CSV_PATH,
+        read_options=pacsv.ReadOptions(block_size=CASES_BLOCK_SIZE),
+        convert_options=pacsv.ConvertOptions(column_types=CASES_COLUMN_TYPES)
     )
-    print(f"✅ 'admin_woredas' table populated with {len(woredas_gdf)} geometries.")
+    for batch in reader:
+        yield batch.to_pandas(types_mapper=pd.ArrowDtype)
 
-def populate_outbreaks_table(conn, cases_df):
-    """Populates the 'outbreaks' table with the initial report data."""
+def populate_outbreaks_table(conn, case_chunks):
+    """Populates the 'outbreaks' table with the initial report data, one CSV chunk at a time."""
     print("⏳ Populating 'outbreaks' table with initial reports...")
     
     with conn.cursor() as cur:
-        for index, row in cases_df.iterrows():
-            cur.execute(
-                """
-                INSERT INTO outbreaks (report_date, woreda_code, latitude, longitude, species_affected, initial_complaint, reporter_name, status)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
-                """,
-                (
-                    row['report_date'],
-                    row['woreda_code'],
-                    row['latitude'],
-                    row['longitude'],
-                    [row['species']], # Convert single species to an array
-                    row['complaint'],
-                    "Mock Data Generator",
-                    "Unassigned" # All mock reports start as unassigned
-                )
-            )
-    conn.commit()
-    print(f"✅ 'outbreaks' table populated with {len(cases_df)} initial reports.")
+        # Extra sort memory for the index/FK work behind the COPY, for this transaction only
+        cur.execute("SET LOCAL work_mem = '64MB';")
+
+    total_rows = 0
+    for cases_df in case_chunks:
+        # Build the rows in the table's column layout, then stream the chunk in with a COPY
+        outbreaks_df = pd.DataFrame({
+            'report_date': cases_df['report_date'],
+            'woreda_code': cases_df['woreda_code'],
+            'latitude': cases_df['latitude'],
+            'longitude': cases_df['longitude'],
+            'species_affected': '{' + cases_df['species'] + '}', # Single species as a Postgres array literal (vectorized concat)
+            'initial_complaint': cases_df['complaint'],
+            'reporter_name': "Mock Data Generator",
+            'status': "Unassigned" # All mock reports start as unassigned
+        })
+        # The table was created earlier in this same transaction, so the rows can be
+        # loaded pre-frozen (no later hint-bit rewrite or freeze vacuum)
+        copy_dataframe(conn, outbreaks_df, 'outbreaks', freeze=True)
+        total_rows += len(outbreaks_df)
+
+    with conn.cursor() as cur:
+        # Fresh planner statistics for the newly loaded table
+        cur.execute("ANALYZE outbreaks;")
+    print(f"✅ 'outbreaks' table populated with {total_rows} initial reports.")
 
 
 def main():
@@ -145,25 +177,33 @@ def main():
         print("❌ Halting. Could not establish database connection.")
         sys.exit(1)
 
+    if not os.path.exists(CASES_CSV_PATH):
+        print(f"❌ ERROR: Cases CSV file not found at '{CASES_CSV_PATH}'. Run generate_mock_cases.py first.")
+        put_db_connection(conn)
+        return
+
     try:
+        # The whole setup runs as one transaction; a bulk load does not need to
+        # wait for a WAL flush, and nothing is visible until the final commit
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL synchronous_commit = off;")
+
         # Step 1: Create the database schema
         execute_sql_from_file(conn, SCHEMA_SQL_PATH)
         
-        # Step 2: Load the source CSV data
+        # Step 2: Load the disease columns of the source CSV (the full rows are streamed in Step 4)
         print(f"⏳ Reading source data from '{CASES_CSV_PATH}'...")
-        if not os.path.exists(CASES_CSV_PATH):
-            print(f"❌ ERROR: Cases CSV file not found at '{CASES_CSV_PATH}'. Run generate_mock_cases.py first.")
-            return
-        cases_df = pd.read_csv(CASES_CSV_PATH)
+        disease_df = read_case_columns(['disease_code', 'disease_name'])
         print("✅ Source data loaded.")
         
         # Step 3: Populate the lookup tables first
-        populate_diseases_table(conn, cases_df)
+        populate_diseases_table(conn, disease_df)
         populate_woredas_table(conn)
         
         # Step 4: Populate the main outbreaks table
-        populate_outbreaks_table(conn, cases_df)
+        populate_outbreaks_table(conn, iter_case_chunks())
 
+        conn.commit()
         print("\n🎉 Database setup complete! The platform is ready to be used.")
 
     except Exception as e:
@@ -171,8 +211,8 @@ def main():
         conn.rollback() # Rollback any partial changes
     finally:
         if conn:
-            conn.close()
-            print("🔌 Database connection closed.")
+            put_db_connection(conn)
+            print("🔌 Database connection returned to the pool.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
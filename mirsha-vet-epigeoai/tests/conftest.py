@@ -1,29 +1,31 @@
 import pytest
-import os
 from dotenv import load_dotenv
-import psycopg2
+from src.core import database as db
 
 # Load environment variables for the test environment
 load_dotenv()
 
-@pytest.fixture(scope="module")
-def db_connection():
+@pytest.fixture(scope="session")
+def db_pool():
     """
-    A pytest fixture that creates a database connection for a test module.
-    It automatically handles closing the connection after all tests in the module are done.
+    A pytest fixture that provides the application's connection pool for the whole test session,
+    so the connection handshake is paid once rather than per test module.
     """
-    conn = None
+    pool = db.get_pool()
+    print("\n[Test DB] Connection pool ready.")
+    yield pool
+    pool.closeall()
+    print("\n[Test DB] Connection pool closed.")
+
+@pytest.fixture
+def db_connection(db_pool):
+    """
+    A pytest fixture that checks out a pooled connection for a single test.
+    Anything the test left uncommitted is rolled back before the connection goes back to the pool.
+    """
+    conn = db_pool.getconn()
     try:
-        conn = psycopg2.connect(
-            host="db",
-            port=os.getenv("DB_PORT", "5432"),
-            dbname=os.getenv("DB_NAME", "vet_epigeoai_db"),
-            user=os.getenv("DB_USER", "vet_user"),
-            password=os.getenv("DB_PASSWORD", "strongpassword")
-        )
-        print("\n[Test DB] Connection established.")
         yield conn
     finally:
-        if conn:
-            conn.close()
-            print("\n[Test DB] Connection closed.")
\ No newline at end of file
+        conn.rollback()
+        db_pool.putconn(conn)
\ No newline at end of file
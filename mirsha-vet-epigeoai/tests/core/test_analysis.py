@@ -1,26 +1,35 @@
+import pytest
 import geopandas as gpd
 from shapely.geometry import Polygon
+from pysal.lib import weights
 from src.core import analysis as an
 
-def test_calculate_lisa_hotspot():
-    """
-    Tests the LISA calculation on a simple GeoDataFrame with a clear hotspot.
-    """
-    # Create a 2x2 grid of polygons
+@pytest.fixture(scope="module")
+def hotspot_gdf():
+    """A 2x2 grid of polygons with a clear hotspot on the right-hand column."""
     p1 = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)]) # Bottom-left
     p2 = Polygon([(1, 0), (2, 0), (2, 1), (1, 1)]) # Bottom-right (hotspot)
     p3 = Polygon([(0, 1), (1, 1), (1, 2), (0, 2)]) # Top-left
     p4 = Polygon([(1, 1), (2, 1), (2, 2), (1, 2)]) # Top-right (hotspot)
 
-    gdf = gpd.GeoDataFrame([
+    return gpd.GeoDataFrame([
         {'id': 1, 'total_cases': 5},
         {'id': 2, 'total_cases': 100},
         {'id': 3, 'total_cases': 10},
         {'id': 4, 'total_cases': 120}
     ], geometry=[p1, p2, p3, p4], crs="EPSG:4326")
 
-    # Run the LISA analysis
-    result_gdf = an.calculate_lisa(gdf, 'total_cases')
+@pytest.fixture(scope="module")
+def hotspot_weights(hotspot_gdf):
+    """Queen contiguity weights for the grid, built once per module."""
+    return weights.Queen.from_dataframe(hotspot_gdf)
+
+def test_calculate_lisa_hotspot(hotspot_gdf, hotspot_weights):
+    """
+    Tests the LISA calculation on a simple GeoDataFrame with a clear hotspot.
+    """
+    # Run the LISA analysis (on a copy, as calculate_lisa appends columns in place)
+    result_gdf = an.calculate_lisa(hotspot_gdf.copy(), 'total_cases', _w=hotspot_weights)
 
     # Assertions
     assert 'cluster_type' in result_gdf.columns
@@ -1,7 +1,18 @@
 import pytest
 import datetime
+import pandas as pd
 from src.core import database as db
 
+def test_pe_table_round_trip():
+    """Tests that a PE matrix survives the Arrow IPC encoding, including its index."""
+    matrix_df = pd.DataFrame(
+        [[3, 0], [7, 10]],
+        index=["Fever", "Lameness"],
+        columns=["FMD", "PPR"]
+    )
+    decoded_df = db.decode_pe_table(db.encode_pe_table(matrix_df))
+    pd.testing.assert_frame_equal(decoded_df, matrix_df)
+
 @pytest.mark.integration
 class TestDatabaseOperations:
     """
@@ -10,13 +21,15 @@ class TestDatabaseOperations:
     """
     def test_add_and_retrieve_outbreak(self, db_connection):
         """
-        Tests the full lifecycle of a simple outbreak report: add, retrieve, then delete.
+        Tests the full lifecycle of a simple outbreak report: add, retrieve, then assign.
+        Everything runs on the test connection inside a savepoint that is rolled back,
+        so no cleanup DELETE is needed.
         """
         reporter_name = "Pytest Automated Test"
         woreda_name = "Bena Tsemay" # Assumes this woreda exists from setup
         
-        # We will use the main db functions, but need a direct cursor for cleanup
         cur = db_connection.cursor()
+        cur.execute("SAVEPOINT test_sp")
         
         try:
             # 1. Add a new outbreak
@@ -25,27 +38,26 @@ class TestDatabaseOperations:
                 woreda_name=woreda_name,
                 lat=5.5, lon=36.5, species=["Cattle"],
                 complaint="This is a test record.",
-                report_date=datetime.date.today()
+                report_date=datetime.date.today(),
+                conn=db_connection
             )
             assert success is True
             outbreak_id = int(message.split(": ")[-1])
             
             # 2. Retrieve unassigned reports and check if our new one is there
-            unassigned_df = db.get_unassigned_reports()
+            unassigned_df = db.get_unassigned_reports(conn=db_connection)
             assert not unassigned_df.empty
             assert outbreak_id in unassigned_df['outbreak_id'].values
 
             # 3. Assign the outbreak
-            success, msg = db.assign_investigator_to_outbreak(outbreak_id, "Test Investigator")
+            success, msg = db.assign_investigator_to_outbreak(outbreak_id, "Test Investigator", conn=db_connection)
             assert success is True
 
             # 4. Check it is no longer in the unassigned list
-            unassigned_df_after = db.get_unassigned_reports()
+            unassigned_df_after = db.get_unassigned_reports(conn=db_connection)
             assert outbreak_id not in unassigned_df_after['outbreak_id'].values
 
         finally:
-            # 5. VERY IMPORTANT: Clean up the test data
-            print(f"\n[Test DB] Cleaning up test outbreak ID: {outbreak_id}")
-            cur.execute("DELETE FROM outbreaks WHERE outbreak_id = %s", (outbreak_id,))
-            db_connection.commit()
+            # 5. Discard everything the test wrote
+            cur.execute("ROLLBACK TO SAVEPOINT test_sp")
             cur.close()
\ No newline at end of file